@@ -1,32 +1,82 @@
 import os
 import json
 import time
+import random
+import asyncio
 import logging
-from typing import Dict, Any, Optional
-
-import requests
+import itertools
+import contextlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+import aiohttp
+import orjson
+import websockets
+from hexbytes import HexBytes
 from web3 import Web3
-from web3.contract import Contract
-from web3.logs import DISCARD
+from web3.datastructures import AttributeDict
 from web3.types import LogReceipt
-from requests.adapters import HTTPAdapter, Retry
+from eth_hash.utils import auto_choose_backend
+from eth_utils import to_checksum_address
 from dotenv import load_dotenv
 
 # --- Configuration Loading ---
 load_dotenv()
 
-# Configure logging to provide detailed output
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(module)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-)
+logger = logging.getLogger(__name__)
 
 # --- Constants and Environment Variables ---
 # Fetch configuration from environment variables
 SOURCE_CHAIN_WSS_URL = os.getenv('SOURCE_CHAIN_WSS_URL')
 BRIDGE_CONTRACT_ADDRESS = os.getenv('BRIDGE_CONTRACT_ADDRESS')
 DESTINATION_RELAYER_API_URL = os.getenv('DESTINATION_RELAYER_API_URL')
+LISTENER_STATE_FILE = os.getenv('LISTENER_STATE_FILE', 'listener_state.json')
+
+# Retry strategy for relay requests to handle transient network issues
+RELAY_REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=10)
+RELAY_REQUEST_HEADERS = {'Content-Type': 'application/json', 'Connection': 'keep-alive'}
+RELAY_MAX_RETRIES = 5
+RELAY_BACKOFF_FACTOR = 1
+RELAY_RETRY_STATUSES = frozenset({408, 429, 502, 503, 504})
+
+# Reconnect strategy: exponential backoff with jitter, giving up after too many consecutive failures
+RECONNECT_BASE_DELAY = 0.5
+RECONNECT_MAX_DELAY = 30
+RECONNECT_MAX_JITTER = 0.5
+MAX_RECONNECT_ATTEMPTS = 10
+# A connection that stays up this long after catching up is considered healthy and resets the attempt counter
+RECONNECT_STABLE_SECONDS = 60
+
+# WebSocket health: time allowed for the subscription handshake, and keep-alive pings to detect dead sockets
+SUBSCRIBE_TIMEOUT = 10
+WS_PING_INTERVAL = 20
+WS_PING_TIMEOUT = 10
+
+# Catch-up after a reconnect: eth_getLogs block ranges adapt between 1 and LOG_RANGE_MAX blocks.
+# The range is halved when a query times out or the node reports too many results, and doubled on success.
+LOG_RANGE_INITIAL = 500
+LOG_RANGE_MAX = 2000
+LOG_REQUEST_TIMEOUT = 30
+LOG_RANGE_TOO_LARGE_ERROR_CODE = -32005
+
+# Number of recently relayed (transactionHash, logIndex) keys remembered to drop replayed logs
+SEEN_LOGS_MAXLEN = 4096
+
+# Circuit breaker: after this many consecutive failed relay requests, stop calling the relayer for a cooldown
+# period, then send a single probe request
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_COOLDOWN_SECONDS = 30
+
+# A failed batch is kept and resent after this delay (or after the cooldown, once the circuit is open)
+RELAY_BATCH_RETRY_DELAY = 5
+
+# Events are coalesced into one relay request of up to RELAY_BATCH_MAX events or RELAY_BATCH_TIMEOUT_MS of waiting
+RELAY_BATCH_MAX = 64
+RELAY_BATCH_TIMEOUT_MS = 50
+
+# Upper bound on how long shutdown waits for queued events to be relayed
+RELAY_DRAIN_TIMEOUT = 15
 
 # A simple ABI for the 'TokensLocked' event. In a real application, this would be part of a larger contract ABI.
 # event TokensLocked(address indexed token, address indexed sender, address recipient, uint256 amount, uint256 destinationChainId);
@@ -45,217 +95,726 @@ BRIDGE_CONTRACT_ABI = json.dumps([
     }
 ])
 
+# Parse the ABI once at import time and bind the event used to decode every incoming log.
+_ABI_OBJ = json.loads(BRIDGE_CONTRACT_ABI)
+_TOKENS_LOCKED_EVENT = Web3().eth.contract(abi=_ABI_OBJ).events.TokensLocked()
 
-class BlockchainConnector:
-    """Manages the connection to a blockchain node via Web3.py."""
+# Canonical signature of the 'TokensLocked' event; its keccak hash is the log's topic0.
+# Filtering on topic0 lets the node reject non-matching blocks via their log Bloom filter.
+TOKENS_LOCKED_EVENT_SIGNATURE = "TokensLocked(address,address,address,uint256,uint256)"
+TOKENS_LOCKED_TOPIC0 = Web3.keccak(text=TOKENS_LOCKED_EVENT_SIGNATURE).hex()
 
-    def __init__(self, wss_url: str):
-        """
-        Initializes the connector with the WebSocket URL.
+# Length of a 'TokensLocked' log's data field: '0x' followed by three 32-byte ABI words (recipient, amount, chain ID)
+_TOKENS_LOCKED_DATA_LENGTH = 2 + 3 * 64
 
-        Args:
-            wss_url (str): The WebSocket URL of the source chain's node.
-        """
-        if not wss_url:
-            raise ValueError("WebSocket URL (SOURCE_CHAIN_WSS_URL) is not configured.")
-        self.wss_url = wss_url
-        self.web3: Optional[Web3] = None
+# An address occupies the low 20 bytes of a 32-byte ABI word; the 12 bytes above it must be zero
+_ADDRESS_WORD_PADDING = '0' * 24
 
-    def connect(self) -> None:
-        """
-        Establishes a connection to the blockchain node.
-        Includes retry logic for initial connection failures.
-        """
-        logging.info(f"Attempting to connect to blockchain node at {self.wss_url}...")
-        try:
-            self.web3 = Web3(Web3.WebsocketProvider(self.wss_url))
-            if self.is_connected():
-                logging.info(f"Successfully connected to chain ID: {self.web3.eth.chain_id}")
-            else:
-                raise ConnectionError("Failed to connect to the blockchain node after initialization.")
-        except Exception as e:
-            logging.error(f"An error occurred while connecting to the node: {e}")
-            raise
 
-    def is_connected(self) -> bool:
-        """Checks if the Web3 provider is currently connected."""
-        return self.web3 is not None and self.web3.is_connected()
+@dataclass(slots=True, frozen=True)
+class TokensLockedEvent:
+    """A decoded 'TokensLocked' event, in the shape it is relayed to the destination API."""
 
-    def get_contract(self, address: str, abi: str) -> Contract:
-        """
-        Returns a Web3 contract instance.
-
-        Args:
-            address (str): The contract's address.
-            abi (str): The contract's ABI.
-
-        Returns:
-            Contract: A Web3 contract object.
-        """
-        if not self.is_connected():
-            logging.error("Cannot get contract, not connected to the blockchain.")
-            raise ConnectionError("Not connected to the blockchain.")
-        checksum_address = self.web3.to_checksum_address(address)
-        return self.web3.eth.contract(address=checksum_address, abi=abi)
+    transaction_hash: str
+    block_number: int
+    log_index: int
+    token: str
+    sender: str
+    recipient: str
+    # uint256 values overflow JSON's 64-bit integers (and orjson rejects them), so they travel as decimal strings
+    amount: str
+    destination_chain_id: str
 
 
 class EventParser:
     """Parses raw event logs into a structured format."""
 
-    def __init__(self, contract_abi: str):
+    @staticmethod
+    def _to_log_receipt(raw_log: Dict[str, Any]) -> LogReceipt:
         """
-        Initializes the parser with the contract ABI.
+        Converts a raw JSON-RPC log (hex-encoded fields) into the structure web3 expects for decoding.
 
         Args:
-            contract_abi (str): The JSON string of the contract's ABI.
+            raw_log (Dict[str, Any]): The log object as pushed by an 'eth_subscribe' notification.
+
+        Returns:
+            LogReceipt: The log with byte topics/hashes and integer block/log indices.
+        """
+        return AttributeDict({
+            'address': raw_log['address'],
+            'topics': [HexBytes(topic) for topic in raw_log['topics']],
+            'data': HexBytes(raw_log['data']),
+            'blockHash': HexBytes(raw_log['blockHash']),
+            'blockNumber': int(raw_log['blockNumber'], 16),
+            'transactionHash': HexBytes(raw_log['transactionHash']),
+            'transactionIndex': int(raw_log['transactionIndex'], 16),
+            'logIndex': int(raw_log['logIndex'], 16),
+            'removed': raw_log.get('removed', False),
+        })
+
+    @staticmethod
+    def _decode_tokens_locked(raw_log: Dict[str, Any]) -> TokensLockedEvent:
         """
-        # Create a temporary Web3 instance just for ABI parsing
-        self.contract = Web3().eth.contract(abi=contract_abi)
+        Decodes a 'TokensLocked' log straight from its hex fields, bypassing web3's generic ABI decoder.
+        The event has a fixed layout: two indexed addresses in topics[1:3] and three 32-byte words in data.
+        Anything the ABI decoder would reject, such as dirty address padding, is rejected here as well.
 
-    def parse_tokens_locked_event(self, event_log: LogReceipt) -> Dict[str, Any]:
+        Args:
+            raw_log (Dict[str, Any]): The raw event log as received from the node.
+
+        Returns:
+            TokensLockedEvent: The decoded event.
+
+        Raises:
+            ValueError: If the log does not have the expected 'TokensLocked' layout.
+        """
+        topics = raw_log['topics']
+        data = raw_log['data']
+        if len(topics) != 3 or topics[0] != TOKENS_LOCKED_TOPIC0 or len(data) != _TOKENS_LOCKED_DATA_LENGTH:
+            raise ValueError("Log does not have the 'TokensLocked' layout.")
+        if (len(topics[1]) != 66 or len(topics[2]) != 66 or topics[1][2:26] != _ADDRESS_WORD_PADDING
+                or topics[2][2:26] != _ADDRESS_WORD_PADDING or data[2:26] != _ADDRESS_WORD_PADDING):
+            raise ValueError("Log has a malformed address word.")
+        return TokensLockedEvent(
+            transaction_hash=raw_log['transactionHash'],
+            block_number=int(raw_log['blockNumber'], 16),
+            log_index=int(raw_log['logIndex'], 16),
+            token=to_checksum_address('0x' + topics[1][-40:]),
+            sender=to_checksum_address('0x' + topics[2][-40:]),
+            recipient=to_checksum_address('0x' + data[26:66]),
+            amount=str(int(data[66:130], 16)),
+            destination_chain_id=str(int(data[130:194], 16)),
+        )
+
+    def parse_tokens_locked_event(self, event_log: Dict[str, Any]) -> Optional[TokensLockedEvent]:
         """
         Parses a 'TokensLocked' event log.
+        Well-formed logs are decoded inline; anything else falls back to web3's ABI decoder.
 
         Args:
-            event_log (LogReceipt): The raw event log from web3.
+            event_log (Dict[str, Any]): The raw event log as received from the node.
 
         Returns:
-            Dict[str, Any]: A dictionary containing structured event data.
+            Optional[TokensLockedEvent]: The decoded event, or None if the log could not be parsed.
         """
+        try:
+            return self._decode_tokens_locked(event_log)
+        except (KeyError, IndexError, TypeError, ValueError):
+            pass
         try:
             # The 'process_log' method decodes the log's data and topics
-            processed_log = self.contract.events.TokensLocked().process_log(event_log)
-            return {
-                'transactionHash': processed_log.transactionHash.hex(),
-                'blockNumber': processed_log.blockNumber,
-                'event': processed_log.event,
-                'args': {
-                    'token': processed_log.args.token,
-                    'sender': processed_log.args.sender,
-                    'recipient': processed_log.args.recipient,
-                    'amount': str(processed_log.args.amount),  # Convert Wei to string for serialization
-                    'destinationChainId': processed_log.args.destinationChainId
-                }
-            }
+            processed_log = _TOKENS_LOCKED_EVENT.process_log(self._to_log_receipt(event_log))
+            args = processed_log.args
+            return TokensLockedEvent(
+                transaction_hash=event_log['transactionHash'],
+                block_number=processed_log.blockNumber,
+                log_index=processed_log.logIndex,
+                token=args.token,
+                sender=args.sender,
+                recipient=args.recipient,
+                amount=str(args.amount),
+                destination_chain_id=str(args.destinationChainId),
+            )
         except Exception as e:
-            logging.error(f"Failed to parse event log: {event_log}. Error: {e}")
-            return {}
+            logger.error("Failed to parse event log: %s. Error: %s", event_log, e)
+            return None
 
 
 class RelayerService:
-    """Simulates a relayer by sending event data to a destination endpoint."""
-
-    def __init__(self, api_url: str):
+    """
+    Simulates a relayer by sending event data to a destination endpoint.
+
+    Events are queued and coalesced into batches which are POSTed as {"events": [...]}
+    to the '<api_url>/batch' endpoint, so bursts of events share a single HTTP round-trip.
+    Batches are delivered in order, and a failed batch is resent until the destination accepts it.
+    Any 2xx response accepts a batch; any other 4xx response rejects it permanently and it is dropped.
+    """
+
+    def __init__(
+        self,
+        api_url: str,
+        on_relayed: Optional[Callable[[List[TokensLockedEvent]], None]] = None,
+        on_rejected: Optional[Callable[[List[TokensLockedEvent]], None]] = None,
+    ):
         """
         Initializes the relayer service with the destination API URL.
 
         Args:
-            api_url (str): The endpoint URL to which event data will be sent.
+            api_url (str): The base endpoint URL to which event data will be sent.
+            on_relayed (Optional[Callable[[List[TokensLockedEvent]], None]]): Called with each batch
+                once the destination has accepted it.
+            on_rejected (Optional[Callable[[List[TokensLockedEvent]], None]]): Called with each batch
+                the destination has permanently rejected and that was therefore dropped.
         """
         if not api_url:
             raise ValueError("Destination relayer API URL is not configured.")
         self.api_url = api_url
-        self.session = requests.Session()
-        # Configure retry strategy for HTTP requests to handle transient network issues
-        retries = Retry(total=5, backoff_factor=1, status_forcelist=[502, 503, 504])
-        self.session.mount('https://', HTTPAdapter(max_retries=retries))
+        self.on_relayed = on_relayed
+        self.on_rejected = on_rejected
+        self.batch_url = f"{api_url.rstrip('/')}/batch"
+        # The session, queue and flusher are created lazily so that they are bound to the running event loop
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._flusher_task: Optional[asyncio.Task] = None
+        # Size of the batch the flusher has taken off the queue but not finished with yet
+        self._in_flight = 0
+        # Circuit breaker state: consecutive failed requests and the monotonic time until which the circuit stays open
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+        self._open_logged = False
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Returns the shared HTTP session, creating it on first use inside the event loop."""
+        if self._session is None or self._session.closed:
+            # Size the pool for event bursts, cache DNS lookups and keep idle connections warm between batches
+            connector = aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=50,
+                ttl_dns_cache=300,
+                enable_cleanup_closed=True,
+                keepalive_timeout=75,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, headers=RELAY_REQUEST_HEADERS)
+        return self._session
+
+    async def close(self) -> None:
+        """
+        Flushes queued events for up to RELAY_DRAIN_TIMEOUT seconds, then closes the shared HTTP session
+        and its pooled connections.
+        """
+        if self._flusher_task is not None:
+            if not self._flusher_task.done():
+                try:
+                    await asyncio.wait_for(self._queue.join(), RELAY_DRAIN_TIMEOUT)
+                except asyncio.TimeoutError:
+                    logger.warning("Relay queue did not drain within %d seconds. Abandoning %d unrelayed event(s).",
+                                   RELAY_DRAIN_TIMEOUT, self._in_flight + self._queue.qsize())
+                self._flusher_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await self._flusher_task
+            self._flusher_task = None
+            self._queue = None
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _circuit_open(self) -> bool:
+        """Returns True while the circuit breaker is holding batches back after repeated relay failures."""
+        return time.monotonic() < self._open_until
+
+    def _record_failure(self) -> None:
+        """Counts a failed relay request and opens the circuit once CIRCUIT_FAILURE_THRESHOLD is reached."""
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= CIRCUIT_FAILURE_THRESHOLD:
+            # Also re-opens the circuit when the probe sent after a cooldown fails
+            self._open_until = time.monotonic() + CIRCUIT_COOLDOWN_SECONDS
+            self._open_logged = False
+            logger.error("Relay requests failed %d consecutive times. Holding batches for %d seconds before probing again.",
+                         self._consecutive_failures, CIRCUIT_COOLDOWN_SECONDS)
+
+    def _record_success(self) -> None:
+        """Closes the circuit after a successful batch."""
+        if self._consecutive_failures >= CIRCUIT_FAILURE_THRESHOLD:
+            logger.info("Relayer recovered. Closing the circuit breaker.")
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+
+    def relay_transaction_data(self, event: TokensLockedEvent) -> None:
+        """
+        Queues the parsed event data for the next batch sent to the destination relayer API.
+        Events are never dropped; while the circuit breaker is open they wait in the queue.
+        Must be called from within the running event loop.
+
+        Args:
+            event (TokensLockedEvent): The decoded event.
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._flusher_task is None or self._flusher_task.done():
+            # A restarted flusher picks up the existing queue, so events already waiting in it are not lost
+            self._flusher_task = asyncio.create_task(self._flusher())
+        self._queue.put_nowait(event)
+
+    async def _flusher(self) -> None:
+        """Collects up to RELAY_BATCH_MAX queued events, or whatever arrives within RELAY_BATCH_TIMEOUT_MS, and sends them."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + RELAY_BATCH_TIMEOUT_MS / 1000
+            while len(batch) < RELAY_BATCH_MAX:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            self._in_flight = len(batch)
+            try:
+                await self._deliver(batch)
+            except Exception:
+                # One bad batch must not kill the flusher and strand every event queued behind it
+                logger.exception("Unexpected error while relaying a batch of %d event(s).", len(batch))
+            finally:
+                self._in_flight = 0
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _deliver(self, events: List[TokensLockedEvent]) -> None:
+        """
+        Sends a batch, resending it until the destination accepts or permanently rejects it.
+        While the circuit breaker is open nothing is sent; the batch waits for the cooldown to expire.
 
-    def relay_transaction_data(self, event_data: Dict[str, Any]) -> bool:
+        Args:
+            events (List[TokensLockedEvent]): The decoded events, in the order they were received.
+        """
+        while True:
+            if self._circuit_open():
+                if not self._open_logged:
+                    logger.warning("Relayer circuit breaker is open. Holding %d event(s) until the cooldown expires.",
+                                   len(events) + self._queue.qsize())
+                    self._open_logged = True
+                await asyncio.sleep(self._open_until - time.monotonic())
+            # Once the circuit has tripped, a single request probes the destination before retries resume
+            half_open = self._consecutive_failures >= CIRCUIT_FAILURE_THRESHOLD
+            if await self._post_batch(events, 0 if half_open else RELAY_MAX_RETRIES):
+                return
+            if not self._circuit_open():
+                await asyncio.sleep(RELAY_BATCH_RETRY_DELAY)
+
+    async def _post_batch(self, events: List[TokensLockedEvent], max_retries: int) -> bool:
         """
-        Sends the parsed event data to the destination relayer API.
+        Sends a batch of events to the destination relayer API in a single request.
 
         Args:
-            event_data (Dict[str, Any]): The structured event data.
+            events (List[TokensLockedEvent]): The decoded events, in the order they were received.
+            max_retries (int): How many times a failed request may be retried.
 
         Returns:
-            bool: True if the data was sent successfully, False otherwise.
+            bool: True once the batch is settled, i.e. accepted or permanently rejected and dropped;
+                False if it should be resent.
         """
-        headers = {'Content-Type': 'application/json'}
+        # Serialized exactly once; every retry below resends the same bytes.
+        # orjson encodes the slots dataclasses natively, so no intermediate dict is built per event.
+        body = orjson.dumps({'events': events})
+        logger.debug("Relaying batch of %d event(s) to %s...", len(events), self.batch_url)
         try:
-            logging.info(f"Relaying event data to {self.api_url}...")
-            response = self.session.post(self.api_url, json=event_data, headers=headers, timeout=10)
-            response.raise_for_status()  # Raise an exception for bad status codes (4xx or 5xx)
-            logging.info(f"Successfully relayed transaction {event_data.get('transactionHash')}. Response: {response.json()}")
-            return True
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Failed to relay transaction data for {event_data.get('transactionHash')}. Error: {e}")
+            response_text = await self._send(body, max_retries)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if isinstance(e, aiohttp.ClientResponseError) and 400 <= e.status < 500 and e.status not in RELAY_RETRY_STATUSES:
+                # Resending a batch the destination refuses would block every later event; log it in full instead
+                logger.error("Relayer rejected batch of %d event(s) with HTTP %d (%s). Dropping it: %s",
+                             len(events), e.status, e.message, body.decode())
+                self._record_success()
+                if self.on_rejected is not None:
+                    self.on_rejected(events)
+                return True
+            tx_hashes = ', '.join(event.transaction_hash for event in events)
+            logger.error("Failed to relay transaction data for %s. Error: %s", tx_hashes, str(e) or repr(e))
             return False
+        self._record_success()
+        logger.info("Successfully relayed batch of %d event(s). Response: %s", len(events), response_text or '<empty>')
+        if self.on_relayed is not None:
+            self.on_relayed(events)
+        return True
+
+    async def _send(self, body: bytes, max_retries: int = RELAY_MAX_RETRIES) -> str:
+        """
+        POSTs a pre-serialized JSON body to the batch endpoint.
+        Connection errors, timeouts and RELAY_RETRY_STATUSES responses are retried with exponential backoff.
+        Every failed attempt counts towards the circuit breaker, and retrying stops as soon as it opens.
+
+        Args:
+            body (bytes): The JSON request body.
+            max_retries (int): How many times a failed request may be retried.
+
+        Returns:
+            str: The response body. Any 2xx status means the batch was accepted, whatever the body holds.
+
+        Raises:
+            aiohttp.ClientError: If the request fails with a non-retryable error or retries are exhausted.
+            asyncio.TimeoutError: If the final attempt timed out.
+        """
+        session = self._get_session()
+        for attempt in range(max_retries + 1):
+            if attempt:
+                await asyncio.sleep(RELAY_BACKOFF_FACTOR * 2 ** (attempt - 1))
+            try:
+                async with session.post(self.batch_url, data=body, timeout=RELAY_REQUEST_TIMEOUT) as response:
+                    response.raise_for_status()  # Raise an exception for bad status codes (4xx or 5xx)
+                    return await response.text(errors='replace')
+            except aiohttp.ClientResponseError as e:
+                if e.status not in RELAY_RETRY_STATUSES:
+                    if e.status >= 500:
+                        self._record_failure()
+                    raise  # Rejections (other 4xx) say nothing about the destination's health
+                error = e
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                error = e
+            self._record_failure()
+            if attempt == max_retries or self._circuit_open():
+                raise error
+            logger.warning("Relay request failed (%s). Retrying (%d/%d)...", str(error) or repr(error), attempt + 1, max_retries)
+
+
+class BlockCheckpoint:
+    """Persists the highest block up to which every event has been relayed, so a restart resumes after it."""
+
+    def __init__(self, path: str):
+        """
+        Initializes the checkpoint and loads any previously saved block number.
+
+        Args:
+            path (str): The JSON file in which the checkpoint is stored.
+        """
+        self.path = path
+        self.last_seen_block: Optional[int] = self._load()
+
+    def _load(self) -> Optional[int]:
+        """Reads the saved block number, or returns None if there is no usable checkpoint."""
+        try:
+            with open(self.path) as f:
+                return int(json.load(f)['last_seen_block'])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring unreadable checkpoint file %s: %s", self.path, e)
+            return None
+
+    def advance(self, block_number: int) -> None:
+        """
+        Moves the checkpoint forward to the given block and saves it. Older block numbers are ignored.
+
+        Args:
+            block_number (int): A block such that every event in it and in all earlier blocks has been relayed.
+        """
+        if self.last_seen_block is not None and block_number <= self.last_seen_block:
+            return
+        self.last_seen_block = block_number
+        # Write to a temporary file first so a crash never leaves a truncated checkpoint behind
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'last_seen_block': block_number}, f)
+        os.replace(tmp_path, self.path)
 
 
 class BridgeEventListener:
     """The main orchestrator that listens for blockchain events and coordinates processing."""
 
-    def __init__(self, config: Dict[str, str]):
+    def __init__(self, config: Dict[str, Any]):
         """
         Initializes the listener with all necessary components.
 
         Args:
-            config (Dict[str, str]): A dictionary containing configuration values.
+            config (Dict[str, Any]): A dictionary containing configuration values.
         """
         self.config = config
-        self.connector = BlockchainConnector(config['wss_url'])
-        self.parser = EventParser(config['abi'])
-        self.relayer = RelayerService(config['relayer_url'])
-        self.contract: Optional[Contract] = None
-
-    def _event_handler(self, event_log: LogReceipt) -> None:
+        if not config['wss_url']:
+            raise ValueError("WebSocket URL (SOURCE_CHAIN_WSS_URL) is not configured.")
+        contract_address = config['contract_address']
+        if not Web3.is_address(contract_address):
+            raise ValueError(f"Invalid BRIDGE_CONTRACT_ADDRESS: {contract_address}")
+        # The address is constant for the lifetime of the listener, so checksum it only once
+        self._checksum_address = Web3.to_checksum_address(contract_address)
+        self.parser = EventParser()
+        self.relayer = RelayerService(
+            config['relayer_url'], on_relayed=self._on_events_settled, on_rejected=self._on_events_settled
+        )
+        self.checkpoint = BlockCheckpoint(config['state_file'])
+        # Node-side log filter: only 'TokensLocked' logs emitted by the bridge contract
+        self._log_filter = {'address': self._checksum_address, 'topics': [TOKENS_LOCKED_TOPIC0]}
+        # Serialized once so that reconnects only have to resend it
+        self._subscribe_request = json.dumps({
+            'jsonrpc': '2.0',
+            'id': 1,
+            'method': 'eth_subscribe',
+            'params': ['logs', self._log_filter],
+        })
+        # Logs handed to the relayer but not yet accepted by the destination, keyed like _seen, with their block numbers
+        self._pending: Dict[Tuple[str, int], int] = {}
+        # Highest block whose logs have all been received, whether relayed yet or not
+        self._received_through: Optional[int] = None
+        # Bounded LRU of (transactionHash, logIndex) keys already relayed, so reorg replays and
+        # overlapping fetches are relayed only once
+        self._seen: OrderedDict = OrderedDict()
+        # Consecutive failed connection attempts, and the monotonic time at which the current connection
+        # finished catching up; the counter is only reset once a connection has stayed up long enough
+        self._reconnect_attempt = 0
+        self._connected_since: Optional[float] = None
+        # Current eth_getLogs block range; adapted to what the node can serve
+        self._log_range = LOG_RANGE_INITIAL
+        # JSON-RPC request IDs for catch-up queries; ID 1 is reserved for the subscription request
+        self._request_ids = itertools.count(2)
+        # Source chain ID, queried on the first connection only so that it is logged once
+        self._chain_id: Optional[int] = None
+
+    def _mark_received_through(self, block_number: int) -> None:
+        """Records that every log up to and including the given block has been received."""
+        if self._received_through is None or block_number > self._received_through:
+            self._received_through = block_number
+
+    def _advance_checkpoint(self) -> None:
+        """
+        Moves the checkpoint to the last fully received block that lies below every unrelayed event.
+        The checkpoint therefore only ever covers whole blocks whose events have all been accepted.
+        """
+        if self._received_through is None:
+            return
+        safe_block = self._received_through
+        if self._pending:
+            safe_block = min(safe_block, min(self._pending.values()) - 1)
+        self.checkpoint.advance(safe_block)
+
+    def _on_events_settled(self, events: List[TokensLockedEvent]) -> None:
+        """
+        Marks a batch the destination accepted, or permanently rejected, as done and advances the block checkpoint.
+        Rejected events are not retried: replaying them would only be rejected again.
+        """
+        for event in events:
+            log_key = (event.transaction_hash, event.log_index)
+            self._pending.pop(log_key, None)
+            self._seen[log_key] = None
+            self._seen.move_to_end(log_key)
+        while len(self._seen) > SEEN_LOGS_MAXLEN:
+            self._seen.popitem(last=False)
+        self._advance_checkpoint()
+
+    def _event_handler(self, event_log: Dict[str, Any]) -> None:
         """The callback function to handle incoming events."""
-        logging.info(f"Received new event log for transaction: {event_log.transactionHash.hex()}")
-        parsed_data = self.parser.parse_tokens_locked_event(event_log)
-        if parsed_data:
-            self.relayer.relay_transaction_data(parsed_data)
+        if event_log.get('removed'):
+            logger.warning("Ignoring log removed by a chain reorganization: %s", event_log['transactionHash'])
+            return
+        log_key = (event_log['transactionHash'], int(event_log['logIndex'], 16))
+        if log_key in self._pending:
+            logger.debug("Skipping event log already queued for relaying for transaction: %s", event_log['transactionHash'])
+            return
+        if log_key in self._seen:
+            self._seen.move_to_end(log_key)
+            logger.debug("Skipping already relayed event log for transaction: %s", event_log['transactionHash'])
+            return
+        logger.debug("Received new event log for transaction: %s", event_log['transactionHash'])
+        parsed_event = self.parser.parse_tokens_locked_event(event_log)
+        if parsed_event is not None:
+            self._pending[log_key] = parsed_event.block_number
+            # Queued for the relayer's background flusher so a slow destination does not stall log handling
+            self.relayer.relay_transaction_data(parsed_event)
+
+    def _dispatch_notification(self, payload: Dict[str, Any], subscription_id: str) -> None:
+        """Hands the log carried by a subscription notification to the event handler."""
+        params = payload.get('params')
+        if params and params.get('subscription') == subscription_id:
+            event_log = params['result']
+            # The node pushes logs block by block, so a log from block N means every earlier block is complete
+            self._mark_received_through(int(event_log['blockNumber'], 16) - 1)
+            self._event_handler(event_log)
+
+    async def _rpc_request(self, ws, method: str, params: List[Any], notifications: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Sends a JSON-RPC request over the subscription socket and waits for its response.
 
-    def start_listening(self) -> None:
+        Args:
+            ws: The open WebSocket connection.
+            method (str): The JSON-RPC method name.
+            params (List[Any]): The JSON-RPC parameters.
+            notifications (List[Dict[str, Any]]): Collects any other messages (e.g. subscription
+                notifications) received while waiting.
+
+        Returns:
+            Dict[str, Any]: The JSON-RPC response object.
         """
-        Connects to the blockchain and starts the event listening loop.
-        This method will run indefinitely until interrupted.
+        request_id = next(self._request_ids)
+        await ws.send(json.dumps({'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params}))
+        while True:
+            payload = orjson.loads(await ws.recv())
+            if payload.get('id') == request_id:
+                return payload
+            notifications.append(payload)
+
+    async def _catch_up(self, ws, notifications: List[Dict[str, Any]]) -> None:
         """
-        while True: # Outer loop for handling connection drops
+        Replays 'TokensLocked' logs emitted since the checkpointed block using ranged eth_getLogs calls,
+        so that events emitted while the listener was disconnected are not lost. Without a checkpoint the
+        replay starts after the last fully received block, and a first run starts from the chain head.
+
+        Args:
+            ws: The open WebSocket connection.
+            notifications (List[Dict[str, Any]]): Collects subscription notifications received meanwhile.
+        """
+        response = await asyncio.wait_for(
+            self._rpc_request(ws, 'eth_blockNumber', [], notifications), LOG_REQUEST_TIMEOUT
+        )
+        if 'error' in response:
+            raise ConnectionError(f"eth_blockNumber was rejected by the node: {response['error']}")
+        head_block = int(response['result'], 16)
+        last_seen_block = self.checkpoint.last_seen_block
+        if last_seen_block is None:
+            last_seen_block = self._received_through
+        if last_seen_block is None:
+            # First run: start from the chain head like a fresh listener, and remember it for later reconnects
+            self._mark_received_through(head_block)
+            self._advance_checkpoint()
+            return
+        from_block = last_seen_block + 1
+        if from_block <= head_block:
+            logger.info("Catching up on 'TokensLocked' events in blocks %d-%d...", from_block, head_block)
+
+        while from_block <= head_block:
+            to_block = min(from_block + self._log_range - 1, head_block)
+            params = [dict(self._log_filter, fromBlock=hex(from_block), toBlock=hex(to_block))]
             try:
-                self.connector.connect()
-                contract_address = self.config['contract_address']
-                if not self.connector.web3.is_address(contract_address):
-                     raise ValueError(f"Invalid BRIDGE_CONTRACT_ADDRESS: {contract_address}")
-                
-                self.contract = self.connector.get_contract(contract_address, self.config['abi'])
-                event_filter = self.contract.events.TokensLocked.create_filter(fromBlock='latest')
-
-                logging.info(f"Starting to listen for 'TokensLocked' events on contract {contract_address}...")
-                while self.connector.is_connected():
-                    for event in event_filter.get_new_entries():
-                        self._event_handler(event)
-                    time.sleep(5) # Poll every 5 seconds
-
-            except (ConnectionError, ValueError, Exception) as e:
-                logging.error(f"An error occurred in the listening loop: {e}. Attempting to reconnect in 30 seconds...")
-                time.sleep(30)
-            finally:
-                logging.warning("Connection lost or loop interrupted.")
+                response = await asyncio.wait_for(
+                    self._rpc_request(ws, 'eth_getLogs', params, notifications), LOG_REQUEST_TIMEOUT
+                )
+                error = response.get('error')
+            except asyncio.TimeoutError:
+                error = {'code': LOG_RANGE_TOO_LARGE_ERROR_CODE, 'message': 'request timed out'}
+
+            if error is not None:
+                if error.get('code') != LOG_RANGE_TOO_LARGE_ERROR_CODE or self._log_range == 1:
+                    raise ConnectionError(f"eth_getLogs for blocks {from_block}-{to_block} failed: {error}")
+                self._log_range = max(1, self._log_range // 2)
+                logger.warning("eth_getLogs for blocks %d-%d failed (%s). Retrying with a range of %d blocks...",
+                               from_block, to_block, error.get('message'), self._log_range)
+                continue
+
+            for event_log in response['result']:
+                self._event_handler(event_log)
+            self._mark_received_through(to_block)
+            self._advance_checkpoint()
+            from_block = to_block + 1
+            self._log_range = min(LOG_RANGE_MAX, self._log_range * 2)
+
+    async def _subscribe(self, ws) -> str:
+        """
+        Sends the 'eth_subscribe' request and waits for the node to acknowledge it.
+
+        Args:
+            ws: The open WebSocket connection.
+
+        Returns:
+            str: The subscription ID that tags the node's log notifications.
+        """
+        await ws.send(self._subscribe_request)
+        response = orjson.loads(await ws.recv())
+        if 'error' in response:
+            raise ConnectionError(f"Log subscription was rejected by the node: {response['error']}")
+        return response['result']
+
+    async def _log_chain_id(self, ws, notifications: List[Dict[str, Any]]) -> None:
+        """
+        Queries and logs the chain ID of the node the listener is connected to.
+
+        Args:
+            ws: The open WebSocket connection.
+            notifications (List[Dict[str, Any]]): Collects subscription notifications received meanwhile.
+        """
+        response = await asyncio.wait_for(
+            self._rpc_request(ws, 'eth_chainId', [], notifications), SUBSCRIBE_TIMEOUT
+        )
+        if 'error' in response:
+            raise ConnectionError(f"eth_chainId was rejected by the node: {response['error']}")
+        self._chain_id = int(response['result'], 16)
+        logger.info("Successfully connected to chain ID: %s", self._chain_id)
+
+    async def _subscribe_and_listen(self) -> None:
+        """
+        Subscribes to 'TokensLocked' logs over a raw WebSocket and dispatches them as the node pushes them.
+        Events missed since the last checkpoint are replayed first. Keep-alive pings surface a dead socket
+        within WS_PING_INTERVAL + WS_PING_TIMEOUT seconds; the coroutine raises once the socket is closed.
+        """
+        async with websockets.connect(
+            self.config['wss_url'],
+            open_timeout=SUBSCRIBE_TIMEOUT,
+            ping_interval=WS_PING_INTERVAL,
+            ping_timeout=WS_PING_TIMEOUT,
+        ) as ws:
+            # A stuck handshake must not hang the listener
+            subscription_id = await asyncio.wait_for(self._subscribe(ws), SUBSCRIBE_TIMEOUT)
+            logger.info("Subscribed to 'TokensLocked' logs (subscription ID: %s).", subscription_id)
+
+            # Subscribing before catching up leaves no gap; logs pushed meanwhile are handled after the older ones
+            notifications: List[Dict[str, Any]] = []
+            if self._chain_id is None:
+                await self._log_chain_id(ws, notifications)
+            await self._catch_up(ws, notifications)
+            for payload in notifications:
+                self._dispatch_notification(payload, subscription_id)
+            self._connected_since = time.monotonic()
+
+            async for message in ws:
+                self._dispatch_notification(orjson.loads(message), subscription_id)
+        raise ConnectionError("Log subscription socket was closed by the node")
+
+    def _next_reconnect_delay(self) -> float:
+        """Returns the backoff delay for the current reconnect attempt: exponential, capped, with random jitter."""
+        delay = min(RECONNECT_MAX_DELAY, RECONNECT_BASE_DELAY * 2 ** self._reconnect_attempt)
+        return delay + random.uniform(0, RECONNECT_MAX_JITTER)
+
+    async def start_listening(self) -> None:
+        """
+        Connects to the blockchain and starts the event listening loop.
+        This coroutine will run until interrupted, or until MAX_RECONNECT_ATTEMPTS consecutive connection attempts fail.
+        """
+        try:
+            while True: # Outer loop for handling connection drops
+                try:
+                    logger.info("Attempting to connect to blockchain node at %s...", self.config['wss_url'])
+                    logger.info("Starting to listen for 'TokensLocked' events on contract %s...", self._checksum_address)
+                    await self._subscribe_and_listen()
+
+                except (ConnectionError, ValueError, OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:
+                    # A node that accepts the subscription but then fails catch-up or drops soon after still counts
+                    if self._connected_since is not None and time.monotonic() - self._connected_since >= RECONNECT_STABLE_SECONDS:
+                        self._reconnect_attempt = 0
+                    self._connected_since = None
+                    if self._reconnect_attempt >= MAX_RECONNECT_ATTEMPTS:
+                        raise ConnectionError(f"Giving up after {MAX_RECONNECT_ATTEMPTS} consecutive failed reconnect attempts.") from e
+                    delay = self._next_reconnect_delay()
+                    self._reconnect_attempt += 1
+                    logger.error("An error occurred in the listening loop: %s. Attempting to reconnect in %.1f seconds (attempt %d/%d)...",
+                                 e, delay, self._reconnect_attempt, MAX_RECONNECT_ATTEMPTS)
+                    await asyncio.sleep(delay)
+                finally:
+                    logger.warning("Connection lost or loop interrupted.")
+        finally:
+            # Let queued relays finish before the HTTP session goes away
+            await self.relayer.close()
 
 
 def main():
     """Main function to set up and run the event listener."""
+    # Configure logging to provide detailed output
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(module)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S',
+    )
+
     # Validate that all required environment variables are set
     required_vars = ['SOURCE_CHAIN_WSS_URL', 'BRIDGE_CONTRACT_ADDRESS', 'DESTINATION_RELAYER_API_URL']
     if any(not os.getenv(var) for var in required_vars):
-        logging.error("One or more required environment variables are missing. Please check your .env file.")
-        logging.error(f"Required: {', '.join(required_vars)}")
+        logger.error("One or more required environment variables are missing. Please check your .env file.")
+        logger.error("Required: %s", ', '.join(required_vars))
         return
 
+    # Topic hashes and address checksums are keccak256; make sure they run on a native (pycryptodome/pysha3) backend
+    keccak_backend = auto_choose_backend()
+    logger.info("Using keccak backend: %s", type(keccak_backend).__module__)
+
     config = {
         'wss_url': SOURCE_CHAIN_WSS_URL,
         'contract_address': BRIDGE_CONTRACT_ADDRESS,
         'relayer_url': DESTINATION_RELAYER_API_URL,
-        'abi': BRIDGE_CONTRACT_ABI
+        'state_file': LISTENER_STATE_FILE,
     }
 
     listener = BridgeEventListener(config)
     try:
-        listener.start_listening()
+        asyncio.run(listener.start_listening())
     except KeyboardInterrupt:
-        logging.info("Shutting down event listener gracefully.")
+        logger.info("Shutting down event listener gracefully.")
     except Exception as e:
-        logging.critical(f"A critical, unrecoverable error occurred: {e}", exc_info=True)
+        logger.critical("A critical, unrecoverable error occurred: %s", e, exc_info=True)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,145 @@
+import asyncio
+import contextlib
+import json
+from typing import Any, Callable, Dict, List
+
+import orjson
+import websockets
+from aiohttp import web
+
+from script import TOKENS_LOCKED_TOPIC0
+
+CONTRACT_ADDRESS = '0x' + 'be' * 20
+
+
+def make_raw_log(block_number: int, log_index: int = 0, tx_byte: int = 1, amount: int = 10 ** 18,
+                 destination_chain_id: int = 137) -> Dict[str, Any]:
+    """Builds a 'TokensLocked' log shaped like an eth_subscribe / eth_getLogs result."""
+    return {
+        'address': CONTRACT_ADDRESS,
+        'topics': [
+            TOKENS_LOCKED_TOPIC0,
+            '0x' + '0' * 24 + 'aa' * 20,
+            '0x' + '0' * 24 + 'bb' * 20,
+        ],
+        'data': '0x' + '0' * 24 + 'cc' * 20 + f'{amount:064x}' + f'{destination_chain_id:064x}',
+        'blockHash': '0x' + f'{block_number:064x}',
+        'blockNumber': hex(block_number),
+        'transactionHash': '0x' + f'{tx_byte:02x}' * 32,
+        'transactionIndex': '0x0',
+        'logIndex': hex(log_index),
+        'removed': False,
+    }
+
+
+class FakeDestination:
+    """Stands in for RelayerService._send, recording every request body it receives."""
+
+    def __init__(self):
+        self.bodies: List[Dict[str, Any]] = []
+
+    @property
+    def events(self) -> List[Dict[str, Any]]:
+        return [event for body in self.bodies for event in body['events']]
+
+    async def __call__(self, body: bytes, max_retries: int = 0) -> Any:
+        self.bodies.append(orjson.loads(body))
+        return {'status': 'ok'}
+
+
+@contextlib.asynccontextmanager
+async def destination_server(*responses: Callable[[], web.Response]):
+    """
+    Serves a relayer API over HTTP whose '/batch' endpoint answers with the given responses in turn,
+    repeating the last one. Yields the API base URL and the list of request bodies received.
+    """
+    bodies: List[Dict[str, Any]] = []
+
+    async def handle(request: web.Request) -> web.Response:
+        bodies.append(await request.json())
+        return responses[min(len(bodies), len(responses)) - 1]()
+
+    app = web.Application()
+    app.router.add_post('/api/batch', handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', 0).start()
+    try:
+        yield f"http://127.0.0.1:{runner.addresses[0][1]}/api", bodies
+    finally:
+        await runner.cleanup()
+
+
+class FakeNode:
+    """A minimal JSON-RPC WebSocket node serving eth_subscribe('logs'), eth_chainId, eth_blockNumber and eth_getLogs."""
+
+    def __init__(self, logs: List[Dict[str, Any]], head_block: int, chain_id: int = 11155111):
+        self.logs = logs
+        self.head_block = head_block
+        self.chain_id = chain_id
+        self.requests: List[Dict[str, Any]] = []
+        # Methods answered with a JSON-RPC error instead of a result
+        self.failing_methods = set()
+        self.sockets = []
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://127.0.0.1:{self._server.sockets[0].getsockname()[1]}"
+
+    async def __aenter__(self) -> 'FakeNode':
+        self._server = await websockets.serve(self._handler, '127.0.0.1', 0)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def push(self, raw_log: Dict[str, Any]) -> None:
+        """Sends a log notification to every subscribed client."""
+        self.logs.append(raw_log)
+        message = json.dumps({
+            'jsonrpc': '2.0',
+            'method': 'eth_subscription',
+            'params': {'subscription': '0x5ub', 'result': raw_log},
+        })
+        for ws in self.sockets:
+            await ws.send(message)
+
+    async def drop_connections(self) -> None:
+        for ws in self.sockets:
+            await ws.close()
+        self.sockets.clear()
+
+    async def _handler(self, ws, path=None) -> None:
+        async for message in ws:
+            request = json.loads(message)
+            self.requests.append(request)
+            if request['method'] in self.failing_methods:
+                response = {'error': {'code': -32000, 'message': 'internal error'}}
+            else:
+                response = {'result': self._result(ws, request)}
+            await ws.send(json.dumps(dict(response, jsonrpc='2.0', id=request['id'])))
+
+    def _result(self, ws, request: Dict[str, Any]) -> Any:
+        method = request['method']
+        if method == 'eth_subscribe':
+            self.sockets.append(ws)
+            return '0x5ub'
+        if method == 'eth_chainId':
+            return hex(self.chain_id)
+        if method == 'eth_blockNumber':
+            return hex(self.head_block)
+        if method == 'eth_getLogs':
+            params = request['params'][0]
+            from_block, to_block = int(params['fromBlock'], 16), int(params['toBlock'], 16)
+            return [log for log in self.logs if from_block <= int(log['blockNumber'], 16) <= to_block]
+        raise AssertionError(f"unexpected method {method}")
+
+
+async def wait_for(predicate, timeout: float = 5) -> None:
+    """Polls until predicate() is true."""
+    async def poll():
+        while not predicate():
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(poll(), timeout)
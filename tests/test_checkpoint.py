@@ -0,0 +1,25 @@
+import json
+
+from script import BlockCheckpoint
+
+
+def test_missing_file_means_no_checkpoint(tmp_path):
+    assert BlockCheckpoint(str(tmp_path / 'state.json')).last_seen_block is None
+
+
+def test_unreadable_file_is_ignored(tmp_path):
+    path = tmp_path / 'state.json'
+    path.write_text('{"last_seen_block": ')
+    assert BlockCheckpoint(str(path)).last_seen_block is None
+
+
+def test_advance_persists_and_never_moves_backwards(tmp_path):
+    path = tmp_path / 'state.json'
+    checkpoint = BlockCheckpoint(str(path))
+    checkpoint.advance(120)
+    checkpoint.advance(110)
+
+    assert checkpoint.last_seen_block == 120
+    assert json.loads(path.read_text()) == {'last_seen_block': 120}
+    assert BlockCheckpoint(str(path)).last_seen_block == 120
+    assert not (tmp_path / 'state.json.tmp').exists()
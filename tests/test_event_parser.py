@@ -0,0 +1,57 @@
+import pytest
+
+from fakes import make_raw_log
+from script import EventParser
+
+
+def decode_with_web3(monkeypatch, raw_log):
+    """Parses a log with the inline decoder disabled, so web3's ABI decoder handles it."""
+    def reject(raw_log):
+        raise ValueError("inline decoding disabled")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(EventParser, '_decode_tokens_locked', staticmethod(reject))
+        return EventParser().parse_tokens_locked_event(raw_log)
+
+
+@pytest.mark.parametrize('amount, destination_chain_id', [
+    (0, 1),
+    (10 ** 18, 137),
+    (2 ** 64, 2 ** 64),
+    (2 ** 256 - 1, 2 ** 256 - 1),
+])
+def test_inline_decode_matches_web3(monkeypatch, amount, destination_chain_id):
+    raw_log = make_raw_log(1234, amount=amount, destination_chain_id=destination_chain_id)
+    raw_log['topics'][1] = '0x' + '0' * 24 + 'f1' * 10 + '0a' * 10  # mixed-case checksum
+
+    inline = EventParser._decode_tokens_locked(raw_log)
+
+    assert inline == decode_with_web3(monkeypatch, raw_log)
+    assert inline.amount == str(amount)
+    assert inline.destination_chain_id == str(destination_chain_id)
+
+
+def test_logs_outside_the_fast_path_fall_back_to_web3(monkeypatch):
+    raw_log = make_raw_log(1234, amount=2 ** 200)
+    raw_log['topics'][0] = raw_log['topics'][0].upper().replace('0X', '0x')
+
+    with pytest.raises(ValueError):
+        EventParser._decode_tokens_locked(raw_log)
+    parsed = EventParser().parse_tokens_locked_event(raw_log)
+
+    assert parsed == decode_with_web3(monkeypatch, make_raw_log(1234, amount=2 ** 200))
+    assert parsed.amount == str(2 ** 200)
+
+
+@pytest.mark.parametrize('topic_index', [1, 2, None], ids=['token', 'sender', 'recipient'])
+def test_dirty_address_padding_is_rejected_like_web3(monkeypatch, topic_index):
+    raw_log = make_raw_log(1234)
+    if topic_index is None:
+        raw_log['data'] = '0x01' + raw_log['data'][4:]
+    else:
+        raw_log['topics'][topic_index] = '0x01' + raw_log['topics'][topic_index][4:]
+
+    with pytest.raises(ValueError):
+        EventParser._decode_tokens_locked(raw_log)
+    assert decode_with_web3(monkeypatch, raw_log) is None
+    assert EventParser().parse_tokens_locked_event(raw_log) is None
@@ -0,0 +1,200 @@
+import asyncio
+import contextlib
+
+import aiohttp
+import pytest
+
+import script
+from fakes import CONTRACT_ADDRESS, FakeDestination, FakeNode, make_raw_log, wait_for
+from script import BridgeEventListener
+
+
+def make_listener(node: FakeNode, state_file) -> BridgeEventListener:
+    return BridgeEventListener({
+        'wss_url': node.url,
+        'contract_address': CONTRACT_ADDRESS,
+        'relayer_url': 'http://relayer.invalid/api',
+        'state_file': str(state_file),
+    })
+
+
+@contextlib.asynccontextmanager
+async def running(listener: BridgeEventListener):
+    task = asyncio.create_task(listener.start_listening())
+    try:
+        yield task
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+def test_relays_live_logs_and_queries_chain_id_once(tmp_path):
+    async def run():
+        async with FakeNode([], head_block=100) as node:
+            listener = make_listener(node, tmp_path / 'state.json')
+            listener.relayer._send = destination = FakeDestination()
+            async with running(listener):
+                await wait_for(lambda: node.sockets)
+                await node.push(make_raw_log(101, tx_byte=1))
+                await wait_for(lambda: len(destination.events) == 1)
+                await node.drop_connections()
+                await wait_for(lambda: node.sockets)
+                await node.push(make_raw_log(102, tx_byte=2))
+                await wait_for(lambda: len(destination.events) == 2)
+            return node.requests, destination.events
+
+    requests, events = asyncio.run(run())
+    assert [request['method'] for request in requests].count('eth_chainId') == 1
+    assert [event['block_number'] for event in events] == [101, 102]
+
+
+def test_gives_up_when_catch_up_keeps_failing(tmp_path, monkeypatch):
+    monkeypatch.setattr(script, 'RECONNECT_BASE_DELAY', 0.001)
+    monkeypatch.setattr(script, 'RECONNECT_MAX_JITTER', 0)
+    monkeypatch.setattr(script, 'MAX_RECONNECT_ATTEMPTS', 3)
+    (tmp_path / 'state.json').write_text('{"last_seen_block": 50}')
+
+    async def run():
+        async with FakeNode([], head_block=100) as node:
+            node.failing_methods.add('eth_blockNumber')
+            listener = make_listener(node, tmp_path / 'state.json')
+            with pytest.raises(ConnectionError, match="Giving up"):
+                await asyncio.wait_for(listener.start_listening(), 5)
+            return node.requests
+
+    requests = asyncio.run(run())
+    assert [request['method'] for request in requests].count('eth_subscribe') == 4
+
+
+def test_stable_connection_resets_reconnect_attempts(tmp_path, monkeypatch):
+    monkeypatch.setattr(script, 'RECONNECT_BASE_DELAY', 0.001)
+    monkeypatch.setattr(script, 'RECONNECT_MAX_JITTER', 0)
+
+    async def run(stable_seconds):
+        monkeypatch.setattr(script, 'RECONNECT_STABLE_SECONDS', stable_seconds)
+        async with FakeNode([], head_block=100) as node:
+            listener = make_listener(node, tmp_path / 'state.json')
+            listener._reconnect_attempt = 5
+            async with running(listener):
+                await wait_for(lambda: node.sockets)
+                await node.drop_connections()
+                await wait_for(lambda: node.sockets)
+            return listener._reconnect_attempt
+
+    assert asyncio.run(run(0)) == 1
+    assert asyncio.run(run(60)) == 6
+
+
+def test_duplicate_logs_are_relayed_once(tmp_path):
+    async def run():
+        async with FakeNode([], head_block=100) as node:
+            listener = make_listener(node, tmp_path / 'state.json')
+            destination = FakeDestination()
+            accepting = asyncio.Event()
+            attempts = []
+
+            async def slow_send(body, max_retries):
+                attempts.append(body)
+                await accepting.wait()
+                return await destination(body, max_retries)
+
+            listener.relayer._send = slow_send
+            async with running(listener):
+                await wait_for(lambda: node.sockets)
+                raw_log = make_raw_log(101)
+                await node.push(raw_log)
+                await wait_for(lambda: attempts)
+                # Replayed while the first copy is still in flight, then again once it has been relayed
+                await node.push(raw_log)
+                await asyncio.sleep(0.1)
+                accepting.set()
+                await wait_for(lambda: destination.events)
+                await node.push(raw_log)
+                await node.push(make_raw_log(102, tx_byte=2))
+                await wait_for(lambda: len(destination.events) == 2)
+            return destination.events
+
+    events = asyncio.run(run())
+    assert [(event['block_number'], event['log_index']) for event in events] == [(101, 0), (102, 0)]
+
+
+def test_failed_relays_are_not_marked_as_seen(tmp_path, monkeypatch):
+    monkeypatch.setattr(script, 'RELAY_BATCH_RETRY_DELAY', 0.01)
+
+    async def run():
+        async with FakeNode([], head_block=100) as node:
+            listener = make_listener(node, tmp_path / 'state.json')
+            destination = FakeDestination()
+            failures = []
+
+            async def failing_send(body, max_retries):
+                if len(failures) < 2:
+                    failures.append(body)
+                    raise aiohttp.ClientConnectionError("destination is down")
+                return await destination(body, max_retries)
+
+            listener.relayer._send = failing_send
+            async with running(listener):
+                await wait_for(lambda: node.sockets)
+                await node.push(make_raw_log(101))
+                await wait_for(lambda: failures)
+                seen_after_failure = dict(listener._seen)
+                await wait_for(lambda: destination.events)
+            return seen_after_failure, listener._seen, destination.events
+
+    seen_after_failure, seen, events = asyncio.run(run())
+    assert seen_after_failure == {}
+    assert list(seen) == [('0x' + '01' * 32, 0)]
+    assert len(events) == 1
+
+
+def test_checkpoint_stays_below_unrelayed_events(tmp_path, monkeypatch):
+    monkeypatch.setattr(script, 'RELAY_BATCH_MAX', 1)
+
+    async def run():
+        async with FakeNode([], head_block=100) as node:
+            listener = make_listener(node, tmp_path / 'state.json')
+            destination = FakeDestination()
+            accepting = asyncio.Event()
+
+            async def stalling_send(body, max_retries):
+                if destination.bodies:
+                    await accepting.wait()
+                return await destination(body, max_retries)
+
+            listener.relayer._send = stalling_send
+            checkpoints = []
+            async with running(listener):
+                await wait_for(lambda: node.sockets)
+                checkpoints.append(listener.checkpoint.last_seen_block)
+                await node.push(make_raw_log(101, log_index=0))
+                await node.push(make_raw_log(101, log_index=1))
+                await node.push(make_raw_log(103, tx_byte=2))
+                await wait_for(lambda: len(destination.events) == 1)
+                # Block 101 is only partly relayed, so the checkpoint must not cover it yet
+                checkpoints.append(listener.checkpoint.last_seen_block)
+                accepting.set()
+                await wait_for(lambda: len(destination.events) == 3)
+                checkpoints.append(listener.checkpoint.last_seen_block)
+            return checkpoints
+
+    # Block 103 may still have logs in flight, so only the blocks before it count as complete
+    assert asyncio.run(run()) == [100, 100, 102]
+
+
+def test_reconnect_replays_blocks_missed_while_disconnected(tmp_path):
+    async def run():
+        async with FakeNode([], head_block=100) as node:
+            listener = make_listener(node, tmp_path / 'state.json')
+            listener.relayer._send = destination = FakeDestination()
+            async with running(listener):
+                await wait_for(lambda: node.sockets)
+                await node.drop_connections()
+                node.logs.append(make_raw_log(105))
+                node.head_block = 110
+                await wait_for(lambda: destination.events)
+                await wait_for(lambda: listener.checkpoint.last_seen_block == 110)
+            return destination.events
+
+    assert [event['block_number'] for event in asyncio.run(run())] == [105]
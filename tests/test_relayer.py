@@ -0,0 +1,164 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+import script
+from fakes import FakeDestination, destination_server, wait_for
+from script import RelayerService, TokensLockedEvent
+
+
+def make_event(block_number: int, tx_byte: int = 1) -> TokensLockedEvent:
+    return TokensLockedEvent(
+        transaction_hash='0x' + f'{tx_byte:02x}' * 32,
+        block_number=block_number,
+        log_index=0,
+        token='0x' + '11' * 20,
+        sender='0x' + '22' * 20,
+        recipient='0x' + '33' * 20,
+        amount=str(2 ** 200),
+        destination_chain_id='137',
+    )
+
+
+def test_events_queued_together_are_sent_as_one_batch():
+    async def run():
+        relayed = []
+        relayer = RelayerService('http://relayer.invalid/api', on_relayed=relayed.append)
+        relayer._send = destination = FakeDestination()
+        for block_number in (10, 10, 11):
+            relayer.relay_transaction_data(make_event(block_number))
+        await relayer.close()
+        return destination.bodies, relayed
+
+    bodies, relayed = asyncio.run(run())
+    assert len(bodies) == 1
+    assert [event['block_number'] for event in bodies[0]['events']] == [10, 10, 11]
+    assert bodies[0]['events'][0]['amount'] == str(2 ** 200)
+    assert [len(batch) for batch in relayed] == [3]
+
+
+def test_batches_are_capped_at_relay_batch_max(monkeypatch):
+    monkeypatch.setattr(script, 'RELAY_BATCH_MAX', 2)
+
+    async def run():
+        relayer = RelayerService('http://relayer.invalid/api')
+        relayer._send = destination = FakeDestination()
+        for block_number in range(5):
+            relayer.relay_transaction_data(make_event(block_number))
+        await relayer.close()
+        return destination.bodies
+
+    bodies = asyncio.run(run())
+    assert [len(body['events']) for body in bodies] == [2, 2, 1]
+
+
+def test_flusher_survives_an_unexpected_error():
+    async def run():
+        relayed = []
+
+        def on_relayed(events):
+            relayed.append(events)
+            if len(relayed) == 1:
+                raise RuntimeError("boom")
+
+        relayer = RelayerService('http://relayer.invalid/api', on_relayed=on_relayed)
+        relayer._send = FakeDestination()
+        relayer.relay_transaction_data(make_event(1))
+        await asyncio.sleep(0.1)
+        flusher_alive = not relayer._flusher_task.done()
+        relayer.relay_transaction_data(make_event(2))
+        await relayer.close()
+        return relayed, flusher_alive
+
+    relayed, flusher_alive = asyncio.run(run())
+    assert flusher_alive
+    assert [[event.block_number for event in batch] for batch in relayed] == [[1], [2]]
+
+
+def test_close_gives_up_on_a_stuck_destination(monkeypatch, caplog):
+    monkeypatch.setattr(script, 'RELAY_DRAIN_TIMEOUT', 0.1)
+
+    async def hang(body, max_retries):
+        await asyncio.Event().wait()
+
+    async def run():
+        relayer = RelayerService('http://relayer.invalid/api')
+        relayer._send = hang
+        relayer.relay_transaction_data(make_event(1))
+        await asyncio.wait_for(relayer.close(), 5)
+        return relayer
+
+    relayer = asyncio.run(run())
+    assert relayer._flusher_task is None
+    assert "Abandoning 1 unrelayed event(s)" in caplog.text
+
+
+def test_failed_batches_are_held_by_the_circuit_breaker_and_resent(monkeypatch):
+    monkeypatch.setattr(script, 'CIRCUIT_FAILURE_THRESHOLD', 2)
+    monkeypatch.setattr(script, 'CIRCUIT_COOLDOWN_SECONDS', 0.3)
+    monkeypatch.setattr(script, 'RELAY_BACKOFF_FACTOR', 0.001)
+    attempts = []
+
+    def reply(status):
+        def respond():
+            attempts.append(time.monotonic())
+            return web.Response(status=status)
+        return respond
+
+    async def run():
+        async with destination_server(reply(503), reply(503), reply(503), reply(204)) as (api_url, bodies):
+            relayer = RelayerService(api_url)
+            relayer.relay_transaction_data(make_event(1))
+            await asyncio.sleep(0.1)
+            # Queued while the circuit is open
+            relayer.relay_transaction_data(make_event(2))
+            await relayer.close()
+        return bodies
+
+    bodies = asyncio.run(run())
+    # Two failed requests open the circuit, so the retry loop stops there; after each cooldown
+    # exactly one probe is sent, and the first one fails again
+    assert attempts[2] - attempts[1] >= 0.3
+    assert attempts[3] - attempts[2] >= 0.3
+    assert [[event['block_number'] for event in body['events']] for body in bodies] == [[1], [1], [1], [1], [2]]
+
+
+@pytest.mark.parametrize('response', [
+    lambda: web.Response(status=204),
+    lambda: web.Response(status=202, text='queued'),
+    lambda: web.json_response({'status': 'ok'}),
+], ids=['204', '202-text', '200-json'])
+def test_any_2xx_response_accepts_the_batch(response):
+    async def run():
+        relayed = []
+        async with destination_server(response) as (api_url, bodies):
+            relayer = RelayerService(api_url, on_relayed=relayed.append)
+            relayer.relay_transaction_data(make_event(1))
+            await relayer.close()
+        return bodies, relayed
+
+    bodies, relayed = asyncio.run(run())
+    assert len(bodies) == 1
+    assert [[event.block_number for event in batch] for batch in relayed] == [[1]]
+
+
+def test_rejected_batches_are_dropped_without_blocking_later_ones():
+    async def run():
+        relayed, rejected = [], []
+        async with destination_server(
+            lambda: web.json_response({'error': 'bad amount'}, status=400),
+            lambda: web.Response(status=204),
+        ) as (api_url, bodies):
+            relayer = RelayerService(api_url, on_relayed=relayed.append, on_rejected=rejected.append)
+            relayer.relay_transaction_data(make_event(1))
+            await wait_for(lambda: rejected)
+            relayer.relay_transaction_data(make_event(2))
+            await relayer.close()
+        return bodies, relayed, rejected
+
+    bodies, relayed, rejected = asyncio.run(run())
+    assert [body['events'][0]['block_number'] for body in bodies] == [1, 2]
+    assert [[event.block_number for event in batch] for batch in rejected] == [[1]]
+    assert [[event.block_number for event in batch] for batch in relayed] == [[2]]
@@ -0,0 +1,41 @@
+from decimal import Decimal, InvalidOperation
+
+import pytest
+
+from unit_converter import convert_eth_unit
+
+
+def test_same_unit_returns_the_int_unchanged():
+    result = convert_eth_unit(42, 'gwei', 'GWEI')
+    assert result == 42 and type(result) is int
+
+
+def test_int_to_smaller_unit_is_an_exact_int():
+    result = convert_eth_unit(2 ** 200, 'ether', 'wei')
+    assert result == 2 ** 200 * 10 ** 18 and type(result) is int
+
+
+@pytest.mark.parametrize('value, from_unit, to_unit, expected', [
+    (1500, 'wei', 'kwei', '1.500'),
+    (1000, 'gwei', 'ether', '0.000001000'),
+    (7, 'wei', 'ether', '7E-18'),
+])
+def test_int_to_larger_unit_is_a_decimal(value, from_unit, to_unit, expected):
+    result = convert_eth_unit(value, from_unit, to_unit)
+    assert type(result) is Decimal
+    assert str(result) == expected
+
+
+@pytest.mark.parametrize('value, expected', [('1.5', '1.5E+18'), (1.5, '1.5E+18'), (Decimal('2'), '2E+18')])
+def test_non_int_values_keep_the_decimal_path(value, expected):
+    assert str(convert_eth_unit(value, 'ether', 'wei')) == expected
+
+
+def test_bool_is_not_treated_as_an_int():
+    with pytest.raises(InvalidOperation):
+        convert_eth_unit(True, 'ether', 'wei')
+
+
+def test_unknown_unit_is_rejected():
+    with pytest.raises(ValueError, match="Invalid 'to_unit'"):
+        convert_eth_unit(1, 'ether', 'lovelace')
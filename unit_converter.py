@@ -1,22 +1,30 @@
 from decimal import Decimal
 from typing import Union
 
-# Conversion factors relative to Wei
-ETH_UNITS = {
-    'wei': Decimal('1'),
-    'kwei': Decimal('1e3'),
-    'mwei': Decimal('1e6'),
-    'gwei': Decimal('1e9'),
-    'szabo': Decimal('1e12'),
-    'finney': Decimal('1e15'),
-    'ether': Decimal('1e18'),
+# Exponent of each unit's conversion factor relative to Wei (1 unit = 10**exponent Wei)
+_UNIT_EXPONENTS = {
+    'wei': 0,
+    'kwei': 3,
+    'mwei': 6,
+    'gwei': 9,
+    'szabo': 12,
+    'finney': 15,
+    'ether': 18,
 }
 
+# Conversion factors relative to Wei, written as Decimal('1eN') so Decimal results keep their original exponents
+ETH_UNITS = {unit: Decimal(f'1e{exponent}') for unit, exponent in _UNIT_EXPONENTS.items()}
+
+# Every power of ten a conversion can need, so integer conversions never recompute them
+_MAX_EXPONENT_DIFF = max(_UNIT_EXPONENTS.values())
+_INT_POWERS_OF_TEN = tuple(10 ** n for n in range(_MAX_EXPONENT_DIFF + 1))
+_DECIMAL_POWERS_OF_TEN = tuple(Decimal(f'1e{n}') for n in range(_MAX_EXPONENT_DIFF + 1))
+
 def convert_eth_unit(
     value: Union[int, float, str, Decimal],
     from_unit: str,
     to_unit: str
-) -> Decimal:
+) -> Union[int, Decimal]:
     """
     Converts a value between different Ethereum units.
 
@@ -26,7 +34,8 @@ def convert_eth_unit(
         to_unit: The target unit (e.g., 'ether', 'gwei', 'wei').
 
     Returns:
-        The converted value as a Decimal, preserving precision.
+        The converted value. Integer inputs converted to an equal or smaller unit are returned as an
+        exact int; every other conversion returns a Decimal, preserving precision.
 
     Raises:
         ValueError: If an invalid unit name is provided.
@@ -39,6 +48,13 @@ def convert_eth_unit(
     if to_unit_lower not in ETH_UNITS:
         raise ValueError(f"Invalid 'to_unit': {to_unit}. Must be one of {list(ETH_UNITS.keys())}")
 
+    # All units are powers of ten, so integer conversions reduce to a single scale by 10**diff
+    if isinstance(value, int) and not isinstance(value, bool):
+        exponent_diff = _UNIT_EXPONENTS[from_unit_lower] - _UNIT_EXPONENTS[to_unit_lower]
+        if exponent_diff >= 0:
+            return value * _INT_POWERS_OF_TEN[exponent_diff]
+        return Decimal(value) / _DECIMAL_POWERS_OF_TEN[-exponent_diff]
+
     # Use Decimal for precision, essential for financial calculations
     value_decimal = Decimal(str(value))
 